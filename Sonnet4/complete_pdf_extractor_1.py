@@ -7,242 +7,1077 @@ sample data, standards, and key calculations.
 """
 
 import base64
+import binascii
+import glob
+import hashlib
+import io
 import json
+import os
 import fitz  # PyMuPDF
+import pandas as pd
 from pathlib import Path
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic, APIConnectionError, APIStatusError
 import re
+import sys
+import random
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
-class CompletePDFExtractor:
-    """Complete PDF extractor using Sonnet 4 vision"""
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors, overloaded
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class PageExtractionError(Exception):
+    """Raised when a page could not be analyzed after all retries"""
+
+
+def retry_delay(error, attempt, base_delay=1.0, max_delay=60.0):
+    """Seconds to wait before retrying ``error``, or None if it isn't retryable
+
+    Uses full-jitter exponential backoff, but never less than the server's
+    retry-after header when one is sent.
+    """
+    retry_after = None
+    if isinstance(error, APIStatusError):
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+        retry_after = error.response.headers.get("retry-after")
+    elif not isinstance(error, APIConnectionError):
+        return None
+
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    try:
+        delay = max(delay, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    return delay
+
+
+class RateLimiter:
+    """Token-bucket request limiter shared by every page and document
+
+    Callers reserve a token and sleep until it is due, so concurrent workers
+    are spread evenly at ``requests_per_minute``. A 429 pauses the whole
+    bucket for the server's retry-after instead of only the failing call.
+    """
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate, self._paused_until - now)
+
+    def acquire(self):
+        time.sleep(self._reserve())
+
+    async def acquire_async(self):
+        await asyncio.sleep(self._reserve())
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def current_rss_bytes():
+    """Resident set size of this process, or None where it can't be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class PeakRSSMonitor:
+    """Sample process RSS on a background thread and keep the peak
+
+    RSS is process-wide, so with several documents in flight the peak covers
+    all of them.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_bytes = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._record()
+
+    def _record(self):
+        rss = current_rss_bytes()
+        if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+            self.peak_bytes = rss
+
+    @property
+    def peak_mb(self):
+        return round(self.peak_bytes / (1024 * 1024), 1) if self.peak_bytes is not None else None
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._record()
+        return False
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """One field of a report layout
+
+    ``kind`` is "first" (first match wins, group 1 is the value), "all"
+    (every match becomes a row built from ``columns``, (name, converter)
+    pairs for the pattern's groups) or "table" (group 1 is a markdown
+    table). Values go to data[section][key], or data[key] without a
+    section. ``prefix`` is the literal the pattern starts with, if any;
+    it lets matches be located with str.find instead of a regex scan.
+    """
+    key: str
+    pattern: str
+    section: str = None
+    kind: str = "first"
+    prefix: str = None
+    flags: int = 0
+    strip: bool = True
+    suffix: str = ""
+    columns: tuple = ()
+
+
+def _number(value):
+    return float(value.replace(',', ''))
+
+
+FIELD_CONVERTERS = {
+    "str": lambda value: value,
+    "strip": lambda value: value.strip(),
+    "number": _number,
+    "optional_str": lambda value: value if value else None,
+    "optional_number": lambda value: _number(value) if value else None
+}
+
+
+def compile_row_parser(columns, groups):
+    """Build a function turning pattern.findall results into row dicts
+
+    Each of the pattern's ``groups`` values goes through its column's
+    FIELD_CONVERTERS entry; the converters are looked up here, once, rather
+    than for every cell.
+    """
+    converters = [(name, FIELD_CONVERTERS[converter]) for name, converter in columns[:groups]]
+
+    def parse_rows(matches):
+        # findall yields tuples for two or more groups and plain strings otherwise
+        if groups < 2:
+            matches = [(match,) for match in matches]
+        return [{name: convert(value) for (name, convert), value in zip(converters, match)} for match in matches]
+
+    return parse_rows
+
+
+class ReportType:
+    """A named report layout whose field patterns and converters are resolved once"""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = [(spec, re.compile(spec.pattern, spec.flags)) for spec in fields]
+        # Row fields get a parser with their converters already resolved
+        self._parsers = [
+            (spec, pattern, compile_row_parser(spec.columns, pattern.groups) if spec.kind == "all" else None)
+            for spec, pattern in self.fields
+        ]
+
+    def empty(self):
+        """The structured dict with every field's section present and nothing extracted"""
+        data = {}
+        for spec, _ in self.fields:
+            empty = {"first": None, "all": [], "table": {"headers": [], "data": []}}[spec.kind]
+            if spec.section is None:
+                data[spec.key] = empty
+            elif spec.kind == "first":
+                data.setdefault(spec.section, {})
+            else:
+                data.setdefault(spec.section, {})[spec.key] = empty
+        return data
+
+    def parse(self, text):
+        data = self.empty()
+        for spec, pattern, parse_rows in self._parsers:
+            target = data if spec.section is None else data[spec.section]
+            if spec.kind == "all":
+                if spec.prefix is None or spec.prefix in text:
+                    target[spec.key] = parse_rows(pattern.findall(text))
+                continue
+            match = first_match(pattern, spec.prefix, text)
+            if not match:
+                continue
+            if spec.kind == "table":
+                target[spec.key] = parse_markdown_table(match.group(1))
+            else:
+                value = match.group(1)
+                target[spec.key] = (value.strip() if spec.strip else value) + spec.suffix
+        return data
+
+
+def first_match(pattern, prefix, text):
+    """pattern.search(text) for a pattern that starts with a literal prefix
+
+    str.find jumps between candidate positions much faster than the regex
+    engine scans for them, and documents without the prefix cost one find.
+    """
+    if prefix is None:
+        return pattern.search(text)
+    pos = text.find(prefix)
+    while pos != -1:
+        match = pattern.match(text, pos)
+        if match:
+            return match
+        pos = text.find(prefix, pos + 1)
+    return None
+
+
+def parse_markdown_table(block):
+    """Parse a markdown table into headers and rows, numeric cells as floats"""
+    table_lines = block.strip().split("\n")
+    headers = [h.strip() for h in table_lines[0].split("|")[1:-1]]
+    table = {"headers": headers, "data": []}
+    for line in table_lines[2:]:
+        cols = [c.strip() for c in line.split("|")[1:-1]]
+        row = {}
+        for i, h in enumerate(headers):
+            try:
+                row[h] = float(cols[i].replace(',', ''))
+            except:
+                row[h] = cols[i]
+        table["data"].append(row)
+    return table
+
+
+REPORT_TYPES = {
+    "plate_reader": ReportType("plate_reader", [
+        FieldSpec("title", r"# Document Analysis - (.+)", "document_info", prefix="# Document Analysis - "),
+        FieldSpec("document_title", r"\*\*Title:\*\* (.+)", "document_info", prefix="**Title:** "),
+        FieldSpec("qc_protocol", r"QC Verified Protocols/(.+?) - Document Status", "document_info", prefix="QC Verified Protocols/"),
+        FieldSpec("status", r"Document Status: (\w+)", "document_info", prefix="Document Status: "),
+        FieldSpec("date", r"\*\*(\d{2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}:\d{2})\*\*", "document_info", strip=False),
+        FieldSpec("wavelength_combination", r"\*\*Wavelength Combination:\*\* (\w+)", "instrument_settings",
+                  prefix="**Wavelength Combination:** ", strip=False),
+        FieldSpec("instrument", r"\*\*Instrument:\*\* (.+)", "instrument_info", prefix="**Instrument:** "),
+        FieldSpec("rom", r"\*\*ROM:\*\* (.+)", "instrument_info", prefix="**ROM:** "),
+        FieldSpec("start_read", r"\*\*Start Read:\*\* (.+)", "instrument_info", prefix="**Start Read:** "),
+        FieldSpec("mean_temperature", r"\*\*Mean Temperature:\*\* ([\d\.]+)°C", "instrument_info",
+                  prefix="**Mean Temperature:** ", strip=False, suffix="°C"),
+        FieldSpec("operator", r"\*\*Read By:\*\* (.+)", "instrument_info", flags=re.IGNORECASE),
+        # Sample Data: Standard Wells (A1-A6)
+        FieldSpec("standard_curve_wells",
+                  r"- \*\*(A\d)\*\*: ([\d\.]+) Std - ([\d\.e,]+) \(Reduced: ([\d\.e,]+)\) - Date: ([\d\-: ]+)",
+                  "sample_data", kind="all", prefix="- **A",
+                  columns=(("well", "str"), ("concentration", "number"), ("fluorescence_value", "number"),
+                           ("reduced_value", "number"), ("date", "str"))),
+        # Control and Sample Wells (B1-B8)
+        FieldSpec("control_and_sample_wells",
+                  r"- \*\*(B\d)\*\*: (.+?) - (?:([\d\.e,]+) \(Reduced: ([\d\.e,]+)\) - Date: ([\d\-: ]+)|Date: No Data)",
+                  "sample_data", kind="all", prefix="- **B",
+                  columns=(("well", "str"), ("sample_type", "strip"), ("fluorescence_value", "optional_number"),
+                           ("reduced_value", "optional_number"), ("date", "optional_str"))),
+        # Per-page content has no trailing page marker, so a table may also end the page
+        FieldSpec("standards_table", r"## Standards Table\n(.+?)(?:\n\n|\Z)", kind="table",
+                  prefix="## Standards Table\n", flags=re.DOTALL),
+        FieldSpec("key_calculation", r"## Key Calculations\n\*\*(.+)\*\*", prefix="## Key Calculations\n")
+    ])
+}
+REPORT_TYPES_FILE = Path(__file__).with_name("report_types.yaml")
+
+
+def load_report_types(path=REPORT_TYPES_FILE):
+    """Register report layouts from a YAML (or .json) file of field specs
+
+    The file maps report type names to lists of FieldSpec arguments; flags
+    are given by name, e.g. ``flags: [IGNORECASE]``.
+    """
+    with open(path, encoding="utf-8") as f:
+        if str(path).endswith(".json"):
+            config = json.load(f)
+        else:
+            import yaml
+            config = yaml.safe_load(f)
+    for name, fields in config.items():
+        specs = []
+        for field in fields:
+            field = dict(field)
+            flags = 0
+            for flag in field.pop("flags", []):
+                flags |= getattr(re, flag)
+            columns = tuple(tuple(column) for column in field.pop("columns", ()))
+            specs.append(FieldSpec(flags=flags, columns=columns, **field))
+        REPORT_TYPES[name] = ReportType(name, specs)
+    return list(config)
+
+
+if REPORT_TYPES_FILE.exists():
+    load_report_types()
+
+PAGE_MARKER_PATTERN = re.compile(r"\n\n=== PAGE (\d+) ===\n")
+# Splits full_content in front of each page marker, keeping the markers
+PAGE_SPLIT_PATTERN = re.compile(r"(?=\n\n=== PAGE \d+ ===\n)")
+# Separates the transcription from the page summary when page_summaries is on
+PAGE_SUMMARY_MARKER = "=== PAGE SUMMARY ==="
+# Static instructions, sent as cacheable system prompts; only the page number and
+# the page image or text vary between calls
+VISION_INSTRUCTIONS = """
+Analyze this PDF page image and extract ALL visible content.
+Please extract:
+1. ALL text content (headings, paragraphs, labels, captions, etc.)
+2. Document structure and sections
+3. Tables, lists, and structured data
+4. Numbers, dates, codes, references
+5. Any technical specifications or data
+6. Document title and main topics
+"""
+PAGE_SUMMARY_INSTRUCTIONS = f"""
+After the extracted content, add a line containing only "{PAGE_SUMMARY_MARKER}"
+followed by a 2-4 sentence summary of this page (document type, purpose, key data).
+"""
+SUMMARY_INSTRUCTIONS = """
+Provide a comprehensive summary of the PDF content you are given.
+Include:
+1. Document title and type
+2. Main topics and sections
+3. Key information and data
+4. Document purpose and context
+"""
+CHUNK_SUMMARY_INSTRUCTIONS = """
+Summarize the part of a longer PDF you are given, for a later combined summary.
+Keep document titles, section names, instrument and sample identifiers, and
+key numbers; omit commentary.
+"""
+STRUCTURED_INSTRUCTIONS = """
+Record the page by calling the record_page tool. Put the full transcription
+of the page, as markdown, in "content". Fill the other fields only with
+values printed on the page and leave out the ones that are not: numbers as
+JSON numbers without thousands separators, dates and times exactly as
+printed, null for wells without data.
+"""
+_OPTIONAL_NUMBER = {"type": ["number", "null"]}
+_OPTIONAL_STRING = {"type": ["string", "null"]}
+# Schema of the record_page tool; matches the dict parse_page_content_to_json builds
+PAGE_DATA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "content": {"type": "string"},
+        "document_info": {
+            "type": "object",
+            "properties": {key: {"type": "string"} for key in ("title", "document_title", "qc_protocol", "status", "date")}
+        },
+        "instrument_settings": {
+            "type": "object",
+            "properties": {"wavelength_combination": {"type": "string"}}
+        },
+        "instrument_info": {
+            "type": "object",
+            "properties": {key: {"type": "string"} for key in ("instrument", "rom", "start_read", "mean_temperature", "operator")}
+        },
+        "sample_data": {
+            "type": "object",
+            "properties": {
+                "standard_curve_wells": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {
+                        "well": {"type": "string"},
+                        "concentration": {"type": "number"},
+                        "fluorescence_value": {"type": "number"},
+                        "reduced_value": {"type": "number"},
+                        "date": {"type": "string"}
+                    },
+                    "required": ["well", "concentration", "fluorescence_value", "reduced_value", "date"]
+                }},
+                "control_and_sample_wells": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {
+                        "well": {"type": "string"},
+                        "sample_type": {"type": "string"},
+                        "fluorescence_value": _OPTIONAL_NUMBER,
+                        "reduced_value": _OPTIONAL_NUMBER,
+                        "date": _OPTIONAL_STRING
+                    },
+                    "required": ["well", "sample_type", "fluorescence_value", "reduced_value", "date"]
+                }}
+            },
+            "required": ["standard_curve_wells", "control_and_sample_wells"]
+        },
+        "standards_table": {
+            "type": "object",
+            "properties": {
+                "headers": {"type": "array", "items": {"type": "string"}},
+                "data": {"type": "array", "items": {"type": "object", "additionalProperties": {"type": ["number", "string"]}}}
+            },
+            "required": ["headers", "data"]
+        },
+        "key_calculation": _OPTIONAL_STRING
+    },
+    "required": ["content", "document_info", "instrument_settings", "instrument_info", "sample_data",
+                 "standards_table", "key_calculation"]
+}
+USAGE_FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+# Rough size of a token, used to turn summary token budgets into character limits
+CHARS_PER_TOKEN = 4
+# Upper bound on the length of a "=== PART n ===" header added by summary_parts
+SUMMARY_PART_HEADER_CHARS = 32
+# Any well of a 96- (A1-H12) or 384-well (A1-P24) plate
+PLATE_WELL_PATTERN = re.compile(r"- \*\*([A-P])(\d{1,2})\*\*: (.+?) - (?:([\d\.e,]+) \(Reduced: ([\d\.e,]+)\) - Date: (.+)|Date: No Data)")
+
+
+def cached_system(text):
+    """A system prompt block marked for prompt caching"""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def usage_counts(response):
+    """Input, cache write, cache read and output token counts of a response"""
+    usage = getattr(response, "usage", None)
+    return {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+
+
+def parse_plate_wells(text, page=None):
+    """Parse every well line of ``text`` into a columnar DataFrame (see plate_table)"""
+    return plate_table([(page, *well) for well in PLATE_WELL_PATTERN.findall(text)])
+
+
+def plate_table(wells):
+    """Build the columnar well DataFrame from PLATE_WELL_PATTERN matches tagged with their page
+
+    One row per well with its plate row letter and column number, sample
+    type, standard concentration (NaN for non-standards) and raw/reduced
+    values as float64 (NaN for wells without data), ready for array-based
+    curve fitting. Numeric conversion is done column-wise, so a whole
+    document is converted in one pass.
+    """
+    wells = pd.DataFrame(wells, columns=["page", "row", "col", "sample", "raw_value", "reduced_value", "date"])
+    wells = wells[wells["col"].astype(int).between(1, 24)]
+    concentration = wells["sample"].str.extract(r"^([\d\.]+) Std$", expand=False)
+    return pd.DataFrame({
+        "page": wells["page"].astype("Int64"),
+        "well": wells["row"] + wells["col"],
+        "row": wells["row"],
+        "col": wells["col"].astype(int),
+        "sample_type": wells["sample"].str.strip().where(concentration.isna(), "Std"),
+        "concentration": pd.to_numeric(concentration).astype(float),
+        "raw_value": pd.to_numeric(wells["raw_value"].str.replace(",", ""), errors="coerce").astype(float),
+        "reduced_value": pd.to_numeric(wells["reduced_value"].str.replace(",", ""), errors="coerce").astype(float),
+        "date": wells["date"].where(wells["date"] != "")
+    }).reset_index(drop=True)
+
+
+def plate_from_sample_data(pages):
+    """Build the plate_table DataFrame from structured well lists instead of markdown
+
+    ``pages`` is (page_number, sample_data) pairs.
+    """
+    wells = pd.DataFrame(
+        [{"page": page, "well": w["well"], "sample_type": sample_type, "concentration": concentration,
+          "raw_value": w["fluorescence_value"], "reduced_value": w["reduced_value"], "date": w["date"]}
+         for page, sample_data in pages
+         for key in ("standard_curve_wells", "control_and_sample_wells")
+         for w in sample_data[key]
+         for sample_type, concentration in [("Std", w["concentration"]) if key == "standard_curve_wells"
+                                            else (w["sample_type"], None)]],
+        columns=["page", "well", "sample_type", "concentration", "raw_value", "reduced_value", "date"]
+    )
+    position = wells["well"].str.extract(r"^([A-P])(\d{1,2})$")
+    return pd.DataFrame({
+        "page": wells["page"].astype("Int64"),
+        "well": wells["well"],
+        "row": position[0],
+        "col": pd.to_numeric(position[1]).astype("Int64"),
+        "sample_type": wells["sample_type"],
+        "concentration": wells["concentration"].astype(float),
+        "raw_value": wells["raw_value"].astype(float),
+        "reduced_value": wells["reduced_value"].astype(float),
+        "date": wells["date"]
+    })
+
+
+def plate_format(plate):
+    """96 or 384, from the highest row letter and column number on the plate"""
+    return 384 if ((plate["row"] > "H") | (plate["col"] > 12)).any() else 96
+
+
+def schema_errors(value, schema, path="$"):
+    """Check a value against the JSON Schema subset used by PAGE_DATA_SCHEMA; returns error strings"""
+    types = schema.get("type")
+    if types:
+        types = [types] if isinstance(types, str) else types
+        checks = {
+            "object": lambda v: isinstance(v, dict),
+            "array": lambda v: isinstance(v, list),
+            "string": lambda v: isinstance(v, str),
+            "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+            "null": lambda v: v is None
+        }
+        if not any(checks[t](value) for t in types):
+            return [f"{path}: expected {' or '.join(types)}, got {type(value).__name__}"]
+    errors = []
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing {key}")
+        for key, item in value.items():
+            item_schema = properties.get(key, schema.get("additionalProperties"))
+            if item_schema:
+                errors.extend(schema_errors(item, item_schema, f"{path}.{key}"))
+    elif isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(schema_errors(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+class PageCache:
+    """On-disk, size-bounded LRU cache of page vision results
+
+    Entries are keyed by a hash of everything that determines the model's
+    answer (image bytes, prompt, model, max_tokens), so re-running a PDF
+    that was already extracted costs no API calls.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> size in bytes, least recently used first
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        for path in sorted(self.cache_dir.glob("*.txt"), key=lambda p: p.stat().st_mtime):
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def key_for(request):
+        """Hash a messages.create request into a cache key"""
+        digest = hashlib.sha256()
+        options = {k: v for k, v in request.items() if k != "messages"}
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        for message in request["messages"]:
+            content = message["content"]
+            blocks = [{"type": "text", "text": content}] if isinstance(content, str) else content
+            for block in blocks:
+                if block["type"] == "image":
+                    digest.update(block["source"]["media_type"].encode())
+                    # Hash in slices rather than encoding a full copy of the image
+                    data = block["source"]["data"]
+                    for start in range(0, len(data), 1 << 16):
+                        digest.update(data[start:start + (1 << 16)].encode("ascii"))
+                else:
+                    digest.update(block["text"].encode())
+                digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self.cache_dir / f"{key}.txt"
+            try:
+                text = path.read_text(encoding="utf-8")
+                os.utime(path)
+            except OSError:
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        data = text.encode("utf-8")
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            (self.cache_dir / f"{key}.txt").write_bytes(data)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                try:
+                    (self.cache_dir / f"{old_key}.txt").unlink()
+                except OSError:
+                    pass
 
-    def __init__(self):
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._entries), "bytes": self._total_bytes}
+
+
+class PDFExtractorBase:
+    """Setup, request building, parsing and output writing shared by the sync and async extractors
+
+    Subclasses set ``client_class`` and supply the API-calling and
+    orchestration methods.
+    """
+
+    def __init__(self, max_workers=4, cache_dir=None, cache_max_bytes=512 * 1024 * 1024,
+                 render_long_edge=1568, image_format="png", grayscale=False, jpeg_quality=85,
+                 text_min_chars=None, requests_per_minute=None, max_retries=5, base_url=None,
+                 max_buffered_pages=None, report_type="plate_reader", summary_chunk_tokens=8000,
+                 summary_map_tokens=500, summary_reduce_tokens=1000, page_summaries=False,
+                 structured_output=False):
         api_key = "YOUR_API_KEY_HERE"
-        self.client = Anthropic(api_key=api_key)
+        # Retries are handled by create_message so they share the rate limiter
+        self.client = self.client_class(api_key=api_key, max_retries=0, base_url=base_url)
+        self.max_workers = max_workers
+        # Rendered pages whose encoded image is still held in memory
+        self.max_buffered_pages = max_buffered_pages
+        self.max_retries = max_retries
+        self.rate_limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+        # Passed to prepare_page; a long edge of None renders at the fixed max scale,
+        # and text_min_chars enables the text-layer shortcut for born-digital pages
+        self.page_options = {
+            "text_min_chars": text_min_chars,
+            "long_edge": render_long_edge,
+            "image_format": image_format,
+            "grayscale": grayscale,
+            "jpeg_quality": jpeg_quality
+        }
+        self.page_cache = PageCache(cache_dir, cache_max_bytes) if cache_dir else None
+        # Name of the REPORT_TYPES layout used to parse each page
+        self.report_type = report_type
+        # Token budgets for generate_summary: input per prompt, output per chunk summary, final output.
+        # A chunk must hold at least two clipped part summaries, or reducing them never shrinks
+        if summary_chunk_tokens * CHARS_PER_TOKEN < 2 * (summary_map_tokens * CHARS_PER_TOKEN + SUMMARY_PART_HEADER_CHARS):
+            raise ValueError(f"summary_chunk_tokens ({summary_chunk_tokens}) must leave room for two part summaries "
+                             f"of summary_map_tokens ({summary_map_tokens}) each")
+        self.summary_budgets = {
+            "chunk_tokens": summary_chunk_tokens,
+            "map_tokens": summary_map_tokens,
+            "reduce_tokens": summary_reduce_tokens
+        }
+        # Ask each vision call for a page summary too; these replace the map stage of
+        # generate_summary, and a single-page document needs no summary call at all
+        self.page_summaries = page_summaries
+        # Have the vision call return the structured fields through the record_page
+        # tool (validated against PAGE_DATA_SCHEMA) instead of regex-parsing markdown
+        self.structured_output = structured_output
         print("✅ Sonnet 4 client initialized with working model")
 
-    def extract_pdf_with_vision(self, pdf_path, output_path="sonnet4_output"):
-        """Extract PDF content using Sonnet 4 vision"""
-        print(f"🔍 Starting PDF extraction: {pdf_path}")
-        Path(output_path).mkdir(exist_ok=True)
+    @staticmethod
+    def new_results(pdf_path, metadata, output_name=None):
+        return {
+            "pdf_path": pdf_path,
+            # Base name of the output files; the PDF's stem unless a batch gave it a unique one
+            "output_name": output_name or Path(pdf_path).stem,
+            "metadata": metadata,
+            "pages": [],
+            "failed_pages": [],
+            "peak_rss_mb": None,
+            # Page text segments, joined into full_content once every page is in
+            "content_segments": [],
+            "full_content": "",
+            "summary": "",
+            # Token counts summed over the page vision calls
+            "usage": {},
+            "structured_data": {},
+            # Columnar well table (DataFrame) built by merge_plates
+            "plate": None
+        }
 
-        try:
-            doc = fitz.open(pdf_path)
-            results = {
-                "pdf_path": pdf_path,
-                "metadata": self.extract_metadata(pdf_path),
-                "pages": [],
-                "full_content": "",
-                "summary": "",
-                "structured_data": {}
-            }
+    @staticmethod
+    def page_record(page_number, page_content, page_info, report_type="plate_reader"):
+        """Build a results["pages"] entry; page_content is None for failed pages
 
-            print(f"📄 Processing {len(doc)} page(s)...")
+        Successful pages are parsed here, as each one arrives, so parsing
+        overlaps the vision calls still in flight for later pages. Well lines
+        are kept as raw ``plate_wells`` matches; merge_plates turns them into
+        one DataFrame per document, so records stay JSON-serializable. A page
+        summary returned by the vision call is split off into ``page_summary``.
+        """
+        page_summary = structured = None
+        if isinstance(page_content, dict):
+            # Structured output: the fields come from the model, validated by decode_page
+            structured = dict(page_content)
+            page_content = structured.pop("content")
+            page_summary = structured.pop("page_summary", None)
+        elif page_content is not None and PAGE_SUMMARY_MARKER in page_content:
+            page_content, page_summary = page_content.rsplit(PAGE_SUMMARY_MARKER, 1)
+            page_content, page_summary = page_content.rstrip(), page_summary.strip()
+        record = {
+            "page_number": page_number,
+            "status": "failed" if page_content is None else "ok",
+            "content": page_content,
+            **page_info
+        }
+        if structured is not None:
+            record["structured_data"] = structured
+        elif page_content is not None:
+            record["structured_data"] = PDFExtractorBase.parse_page_content_to_json(page_content, report_type)
+            del record["structured_data"]["full_content"]
+            record["plate_wells"] = PLATE_WELL_PATTERN.findall(page_content)
+        if page_summary:
+            record["page_summary"] = page_summary
+        return record
 
-            for page_num in range(len(doc)):
-                print(f"   Processing page {page_num + 1}...")
-                page = doc.load_page(page_num)
+    @staticmethod
+    def add_page(results, record):
+        """Record a page; failed pages are kept out of full_content"""
+        results["pages"].append(record)
+        if record["status"] == "failed":
+            results["failed_pages"].append(record["page_number"])
+            return
+
+        results["content_segments"].append(f"\n\n=== PAGE {record['page_number']} ===\n{record['content']}")
+
+    @staticmethod
+    def join_content(results):
+        """Materialize full_content in one pass instead of repeated concatenation"""
+        results["full_content"] = "".join(results.pop("content_segments"))
+        return results["full_content"]
+
+    @staticmethod
+    def split_pages(full_content, report_type="plate_reader"):
+        """Rebuild page records from a saved full_content, parsing each page"""
+        parts = PAGE_MARKER_PATTERN.split(full_content)
+        if len(parts) == 1:
+            return [PDFExtractorBase.page_record(1, full_content, {}, report_type)]
+        return [PDFExtractorBase.page_record(int(number), page_content, {}, report_type)
+                for number, page_content in zip(parts[1::2], parts[2::2])]
+
+    @staticmethod
+    def merge_page_data(pages, full_content, report_type="plate_reader"):
+        """Merge per-page structured data into the document-level dict
+
+        Single-valued fields and tables are taken from the first page that
+        has them and row fields such as wells are concatenated in page order.
+        Rows carry a ``page`` key; the source page of every other field is
+        recorded under ``source_pages``.
+        """
+        report = REPORT_TYPES[report_type]
+        data = report.empty()
+        empty = report.empty()
+        sources = {}
+        pages = sorted((page for page in pages if page["status"] == "ok"), key=lambda page: page["page_number"])
 
-                mat = fitz.Matrix(2.5, 2.5)
-                pix = page.get_pixmap(matrix=mat)
-                img_data = pix.tobytes("png")
-                img_b64 = base64.b64encode(img_data).decode()
+        for spec, _ in report.fields:
+            target = data if spec.section is None else data[spec.section]
+            if spec.kind == "all":
+                for page in pages:
+                    page_data = page["structured_data"] if spec.section is None else page["structured_data"][spec.section]
+                    target[spec.key].extend({**row, "page": page["page_number"]} for row in page_data[spec.key])
+                continue
 
-                page_content = self.analyze_page_vision(img_b64, page_num + 1)
+            source = sources if spec.section is None else sources.setdefault(spec.section, {})
+            if spec.section is None:
+                source[spec.key] = None
+            missing = (empty if spec.section is None else empty[spec.section]).get(spec.key)
+            for page in pages:
+                page_data = page["structured_data"] if spec.section is None else page["structured_data"][spec.section]
+                if page_data.get(spec.key, missing) != missing:
+                    target[spec.key] = page_data[spec.key]
+                    source[spec.key] = page["page_number"]
+                    break
 
-                results["pages"].append({
-                    "page_number": page_num + 1,
-                    "content": page_content,
-                    "image_size": len(img_data)
-                })
+        data["source_pages"] = sources
+        data["full_content"] = full_content
+        return data
+
+    @staticmethod
+    def merge_plates(pages):
+        """Build the document's well table, in page order, from every page's wells at once
 
-                results["full_content"] += f"\n\n=== PAGE {page_num + 1} ===\n{page_content}"
+        Pages parsed from markdown contribute their ``plate_wells`` matches;
+        structured-output pages contribute their sample_data well lists.
+        """
+        pages = sorted((page for page in pages if page["status"] == "ok"), key=lambda page: page["page_number"])
+        plate = plate_table([(page["page_number"], *well) for page in pages for well in page.get("plate_wells", ())])
+        structured = [(page["page_number"], page["structured_data"]["sample_data"])
+                      for page in pages if "plate_wells" not in page]
+        if structured:
+            structured_plate = plate_from_sample_data(structured)
+            plate = structured_plate if plate.empty else \
+                pd.concat([plate, structured_plate], ignore_index=True).sort_values("page", kind="stable", ignore_index=True)
+        plate.attrs["plate_format"] = plate_format(plate)
+        return plate
 
-            doc.close()
+    @staticmethod
+    def usage_totals(pages):
+        """Sum the per-page token counts, plus the share of input tokens read from the prompt cache"""
+        totals = {field: sum(page.get("usage", {}).get(field, 0) for page in pages) for field in USAGE_FIELDS}
+        prompt_tokens = totals["input_tokens"] + totals["cache_creation_input_tokens"] + totals["cache_read_input_tokens"]
+        totals["cache_read_ratio"] = round(totals["cache_read_input_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0
+        return totals
 
-            # Generate summary and structured data
-            results["summary"] = self.generate_summary(results["full_content"])
-            results["structured_data"] = self.parse_page_content_to_json(results["full_content"])
+    @staticmethod
+    def collect_page_summaries(results):
+        """Page summaries in page order, or None unless every successful page has one"""
+        pages = sorted((page for page in results["pages"] if page["status"] == "ok"), key=lambda page: page["page_number"])
+        summaries = [page.get("page_summary") for page in pages]
+        return summaries if summaries and all(summaries) else None
 
-            # Save JSON, TXT, and CSV
-            self.save_json(results, pdf_path, output_path)
+    def write_outputs(self, results, output_path):
+        """Merge the per-page structured data and save JSON, TXT, and CSV (skipped without an output path)"""
+        results["structured_data"] = self.merge_page_data(results["pages"], results["full_content"], self.report_type)
+        results["plate"] = self.merge_plates(results["pages"])
+        if output_path:
+            self.save_json(results, output_path)
             self.save_results(results, output_path)
 
-            return results
+    @staticmethod
+    def prepare_page(page, text_min_chars=None, **render_options):
+        """Turn a page into model input, skipping rendering when it has a text layer
 
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            return None
+        Pages with at least ``text_min_chars`` non-whitespace characters of
+        extractable text are taken as born-digital and read directly; the
+        rest are rendered for the vision model. ``source`` records the path.
+        """
+        if text_min_chars:
+            text = page.get_text()
+            if len("".join(text.split())) >= text_min_chars:
+                return {"source": "text_layer", "text": text}
+        return {"source": "vision", **PDFExtractorBase.render_page(page, **render_options)}
+
+    @staticmethod
+    def render_page(page, long_edge=1568, max_scale=2.5, image_format="png", grayscale=False, jpeg_quality=85):
+        """Render a page to a base64 PNG or JPEG
 
-    def extract_metadata(self, pdf_path):
-        """Extract PDF metadata"""
+        The scale is chosen from the page's MediaBox so the longer edge comes
+        out at ``long_edge`` pixels (never above ``max_scale``); larger images
+        are downscaled by the API anyway and only cost upload time and tokens.
+        Grayscale and JPEG are much smaller and faster to encode for
+        black-and-white instrument printouts.
+        """
+        scale = max_scale
+        if long_edge:
+            mediabox = page.mediabox
+            scale = min(max_scale, long_edge / max(mediabox.width, mediabox.height, 1))
+        mat = fitz.Matrix(scale, scale)
+        colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+        if image_format in ("jpeg", "jpg"):
+            output, options, media_type = "jpeg", {"jpg_quality": jpeg_quality}, "image/jpeg"
+        elif image_format == "png":
+            output, options, media_type = "png", {}, "image/png"
+        else:
+            raise ValueError(f"Unsupported image format: {image_format}")
+
+        pix = page.get_pixmap(matrix=mat, colorspace=colorspace, alpha=False)
+        dimensions = [pix.width, pix.height]
+        img_data = pix.tobytes(output, **options)
+        image_size = len(img_data)
+        # Drop each buffer as soon as the next one exists, so at most two
+        # full-size copies (encoded bytes + str) are alive at any point
+        pix = None
+        encoded = binascii.b2a_base64(img_data, newline=False)
+        img_data = None
+        return {
+            "img_b64": encoded.decode("ascii"),
+            "media_type": media_type,
+            "image_size": image_size,
+            "render_scale": round(scale, 4),
+            "image_dimensions": dimensions
+        }
+
+    @staticmethod
+    def open_document(source):
+        """Open a PDF path, bytes or stream, returning (doc, owns_doc)
+
+        Open documents are reused as-is; in-memory PDFs never touch disk.
+        """
+        if isinstance(source, fitz.Document):
+            return source, False
+        if isinstance(source, (bytes, bytearray, memoryview, io.BytesIO)):
+            return fitz.open(stream=source, filetype="pdf"), True
+        if hasattr(source, "read"):
+            return fitz.open(stream=source.read(), filetype="pdf"), True
+        return fitz.open(source), True
+
+    @staticmethod
+    def document_name(source, doc):
+        """Name used for results["pdf_path"] and output file names"""
+        if isinstance(source, (str, os.PathLike)):
+            return str(source)
+        name = doc.name if isinstance(source, fitz.Document) else getattr(source, "name", None)
+        return str(name) if name else "document.pdf"
+
+    @staticmethod
+    def extract_metadata(doc):
+        """Extract PDF metadata from an open document (or a path)"""
         try:
-            doc = fitz.open(pdf_path)
+            if not isinstance(doc, fitz.Document):
+                with fitz.open(doc) as opened:
+                    return PDFExtractorBase.extract_metadata(opened)
             metadata = doc.metadata
-            doc.close()
             return dict(metadata) if metadata else {}
         except:
             return {}
 
-    def analyze_page_vision(self, img_b64, page_num):
-        """Analyze page image with Sonnet 4 vision"""
-        prompt = f"""
-        Analyze this PDF page image and extract ALL visible content. This is page {page_num}.
-        Please extract:
-        1. ALL text content (headings, paragraphs, labels, captions, etc.)
-        2. Document structure and sections
-        3. Tables, lists, and structured data
-        4. Numbers, dates, codes, references
-        5. Any technical specifications or data
-        6. Document title and main topics
-        """
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4000,
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": img_b64}},
-                        {"type": "text", "text": prompt}
-                    ]
-                }]
-            )
-            content = response.content[0].text
-            print(f"   ✅ Extracted {len(content)} characters from page {page_num}")
-            return content
-        except Exception as e:
-            print(f"   ❌ Vision analysis failed for page {page_num}: {e}")
-            return f"Error analyzing page {page_num}: {str(e)}"
+    def build_vision_request(self, img_b64, page_num, media_type="image/png"):
+        """Build the messages.create arguments for one page image
 
-    def generate_summary(self, content):
-        if not content or len(content.strip()) < 50:
-            return "No substantial content found for summary."
-        try:
-            prompt = f"""
-            Based on this PDF content, provide a comprehensive summary:
-            {content[:3000]}
-            Include:
-            1. Document title and type
-            2. Main topics and sections
-            3. Key information and data
-            4. Document purpose and context
-            """
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
-        except Exception as e:
-            return f"Summary generation failed: {str(e)}"
+        The instructions are a cached system prompt shared by every page; the
+        page number goes with the image so it stays out of the cached prefix.
+        """
+        messages = [{
+            "role": "user",
+            "content": [
+                {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": img_b64}},
+                {"type": "text", "text": f"This is page {page_num}."}
+            ]
+        }]
+        if not self.structured_output:
+            instructions = VISION_INSTRUCTIONS + (PAGE_SUMMARY_INSTRUCTIONS if self.page_summaries else "")
+            return {
+                "model": "claude-sonnet-4-20250514",
+                "max_tokens": 4000,
+                "system": cached_system(instructions),
+                "messages": messages
+            }
 
-    def parse_page_content_to_json(self, page_content):
-        data = {
-            "document_info": {},
-            "instrument_settings": {},
-            "instrument_info": {},
-            "sample_data": {"standard_curve_wells": [], "control_and_sample_wells": []},
-            "standards_table": {"headers": [], "data": []},
-            "key_calculation": None,
-            "full_content": page_content
+        schema = PAGE_DATA_SCHEMA
+        instructions = VISION_INSTRUCTIONS + STRUCTURED_INSTRUCTIONS
+        if self.page_summaries:
+            schema = {**schema, "properties": {**schema["properties"], "page_summary": {"type": "string"}},
+                      "required": schema["required"] + ["page_summary"]}
+            instructions += 'Also put a 2-4 sentence summary of the page in "page_summary".\n'
+        return {
+            "model": "claude-sonnet-4-20250514",
+            # The transcription and the structured fields are both in the output
+            "max_tokens": 8000,
+            "system": cached_system(instructions),
+            "tools": [{"name": "record_page", "description": "Record the transcription and structured fields of one page",
+                       "input_schema": schema}],
+            "tool_choice": {"type": "tool", "name": "record_page"},
+            "messages": messages
         }
 
-        # Document Info
-        doc_title = re.search(r"# Document Analysis - (.+)", page_content)
-        if doc_title:
-            data["document_info"]["title"] = doc_title.group(1).strip()
-
-        title = re.search(r"\*\*Title:\*\* (.+)", page_content)
-        if title:
-            data["document_info"]["document_title"] = title.group(1).strip()
+    @staticmethod
+    def response_text(message):
+        """Text of a response, or the JSON input of its record_page call with structured output"""
+        for block in message.content:
+            if block.type == "tool_use":
+                return json.dumps(block.input, ensure_ascii=False)
+        return message.content[0].text
 
-        qc = re.search(r"QC Verified Protocols/(.+?) - Document Status", page_content)
-        if qc:
-            data["document_info"]["qc_protocol"] = qc.group(1).strip()
+    def decode_page(self, content):
+        """Turn a (possibly cached) vision response into read_page's result
 
-        status = re.search(r"Document Status: (\w+)", page_content)
-        if status:
-            data["document_info"]["status"] = status.group(1).strip()
-
-        date = re.search(r"\*\*(\d{2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}:\d{2})\*\*", page_content)
-        if date:
-            data["document_info"]["date"] = date.group(1)
+        With structured output this is the record_page input, validated
+        against the schema; anything else raises PageExtractionError. Only
+        valid responses are cached, so cache hits decode cleanly.
+        """
+        if not self.structured_output:
+            return content
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            raise PageExtractionError(f"record_page input is not JSON: {e}") from e
+        errors = schema_errors(data, PAGE_DATA_SCHEMA)
+        if errors:
+            raise PageExtractionError(f"invalid record_page input: {'; '.join(errors[:5])}")
+        return data
 
-        # Instrument Settings
-        wl_comb = re.search(r"\*\*Wavelength Combination:\*\* (\w+)", page_content)
-        if wl_comb:
-            data["instrument_settings"]["wavelength_combination"] = wl_comb.group(1)
+    def first_summary_chunks(self, content, page_summaries=None):
+        """Chunks for the first summary level and whether they are already summaries"""
+        if page_summaries:
+            return self.summary_chunks(self.summary_parts(page_summaries)), True
+        return self.summary_chunks(PAGE_SPLIT_PATTERN.split(content)), False
 
-        # Instrument Info
-        instr = re.search(r"\*\*Instrument:\*\* (.+)", page_content)
-        if instr:
-            data["instrument_info"]["instrument"] = instr.group(1).strip()
+    def summary_chunks(self, pieces):
+        """Pack consecutive pieces (pages or part summaries) into chunks within the input budget"""
+        limit = self.summary_budgets["chunk_tokens"] * CHARS_PER_TOKEN
+        chunks, current = [], ""
+        for piece in pieces:
+            while len(piece) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(piece[:limit])
+                piece = piece[limit:]
+            if current and len(current) + len(piece) > limit:
+                chunks.append(current)
+                current = ""
+            current += piece
+        if current.strip() or not chunks:
+            chunks.append(current)
+        return chunks
 
-        rom = re.search(r"\*\*ROM:\*\* (.+)", page_content)
-        if rom:
-            data["instrument_info"]["rom"] = rom.group(1).strip()
+    def reduce_chunks(self, summaries):
+        """Chunks for the next reduce level, cut down to one if packing wouldn't reduce the count
 
-        start_read = re.search(r"\*\*Start Read:\*\* (.+)", page_content)
-        if start_read:
-            data["instrument_info"]["start_read"] = start_read.group(1).strip()
+        The budget check in __init__ makes every level shrink; the fallback
+        keeps the loop finite if the budgets are changed afterwards.
+        """
+        parts = self.summary_parts(summaries)
+        chunks = self.summary_chunks(parts)
+        if len(chunks) >= len(summaries):
+            chunks = ["".join(parts)[:self.summary_budgets["chunk_tokens"] * CHARS_PER_TOKEN]]
+        return chunks
 
-        temp = re.search(r"\*\*Mean Temperature:\*\* ([\d\.]+)°C", page_content)
-        if temp:
-            data["instrument_info"]["mean_temperature"] = temp.group(1) + "°C"
+    def summary_parts(self, summaries):
+        """Label chunk summaries for the reduce step, clipped to the map budget so each level shrinks"""
+        limit = self.summary_budgets["map_tokens"] * CHARS_PER_TOKEN
+        return [f"\n\n=== PART {n} ===\n{summary[:limit]}" for n, summary in enumerate(summaries, start=1)]
 
-        operator = re.search(r"\*\*Read By:\*\* (.+)", page_content, re.IGNORECASE)
-        if operator:
-            data["instrument_info"]["operator"] = operator.group(1).strip()
+    def build_chunk_summary_request(self, chunk):
+        """Build the messages.create arguments for one map-stage chunk summary"""
+        return {
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": self.summary_budgets["map_tokens"],
+            "system": cached_system(CHUNK_SUMMARY_INSTRUCTIONS),
+            "messages": [{"role": "user", "content": chunk}]
+        }
 
-        # Sample Data: Standard Wells (A1-A6)
-        stds = re.findall(r"- \*\*(A\d)\*\*: ([\d\.]+) Std - ([\d\.e,]+) \(Reduced: ([\d\.e,]+)\) - Date: ([\d\-: ]+)", page_content)
-        for well, conc, val, red, date in stds:
-            data["sample_data"]["standard_curve_wells"].append({
-                "well": well,
-                "concentration": float(conc),
-                "fluorescence_value": float(val.replace(',', '')),
-                "reduced_value": float(red.replace(',', '')),
-                "date": date
-            })
+    def build_summary_request(self, content, from_parts=False):
+        """Build the messages.create arguments for the document summary
 
-        # Control and Sample Wells (B1-B8)
-        controls = re.findall(r"- \*\*(B\d)\*\*: (.+?) - (?:(?P<val>[\d\.e,]+) \(Reduced: (?P<red>[\d\.e,]+)\) - Date: (?P<date>[\d\-: ]+)|Date: No Data)", page_content)
-        for c in controls:
-            well, sample, val, red, date = c
-            data["sample_data"]["control_and_sample_wells"].append({
-                "well": well,
-                "sample_type": sample.strip(),
-                "fluorescence_value": float(val.replace(',', '')) if val else None,
-                "reduced_value": float(red.replace(',', '')) if red else None,
-                "date": date if date else None
-            })
-
-        # Standards Table
-        table_match = re.search(r"## Standards Table\n(.+?)\n\n", page_content, re.DOTALL)
-        if table_match:
-            table_lines = table_match.group(1).strip().split("\n")
-            headers = [h.strip() for h in table_lines[0].split("|")[1:-1]]
-            data["standards_table"]["headers"] = headers
-            for line in table_lines[2:]:
-                cols = [c.strip() for c in line.split("|")[1:-1]]
-                row = {}
-                for i, h in enumerate(headers):
-                    try:
-                        row[h] = float(cols[i].replace(',', ''))
-                    except:
-                        row[h] = cols[i]
-                data["standards_table"]["data"].append(row)
-
-        # Key Calculation
-        key_calc = re.search(r"## Key Calculations\n\*\*(.+)\*\*", page_content)
-        if key_calc:
-            data["key_calculation"] = key_calc.group(1).strip()
+        With ``from_parts`` the content is the map-stage summaries of
+        consecutive parts of the document rather than the document itself.
+        """
+        source = "Summaries of consecutive parts of a PDF" if from_parts else "PDF content"
+        return {
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": self.summary_budgets["reduce_tokens"],
+            "system": cached_system(SUMMARY_INSTRUCTIONS),
+            "messages": [{"role": "user", "content": f"{source}:\n{content}"}]
+        }
 
+    @staticmethod
+    def parse_page_content_to_json(page_content, report_type="plate_reader"):
+        """Parse extracted markdown into the structured document dict using a registered report layout"""
+        data = REPORT_TYPES[report_type].parse(page_content)
+        data["full_content"] = page_content
         return data
 
-    def save_json(self, results, pdf_path, output_path):
-        base_name = Path(pdf_path).stem
+    @staticmethod
+    def save_json(results, output_path):
+        base_name = results["output_name"]
         json_file = f"{output_path}/{base_name}_structured.json"
         json_data = results["structured_data"]
         json_data["full_content"] = results["full_content"]
@@ -252,7 +1087,7 @@ class CompletePDFExtractor:
         return json_file
 
     def save_results(self, results, output_path):
-        base_name = Path(results["pdf_path"]).stem
+        base_name = results["output_name"]
         # TXT
         txt_file = f"{output_path}/{base_name}_extracted_content.txt"
         with open(txt_file, 'w', encoding='utf-8') as f:
@@ -260,9 +1095,13 @@ class CompletePDFExtractor:
         # CSV
         csv_file = f"{output_path}/{base_name}_structured_data.csv"
         self.save_as_csv(results, csv_file)
-        return {"txt": txt_file, "csv": csv_file}
+        # Plate wells
+        plate_file = f"{output_path}/{base_name}_plate_wells.csv"
+        results["plate"].to_csv(plate_file, index=False)
+        return {"txt": txt_file, "csv": csv_file, "plate": plate_file}
 
-    def save_as_csv(self, results, csv_file):
+    @staticmethod
+    def save_as_csv(results, csv_file):
         import csv
         with open(csv_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
@@ -274,14 +1113,1005 @@ class CompletePDFExtractor:
                     writer.writerow([key, "", str(value)])
 
 
+class CompletePDFExtractor(PDFExtractorBase):
+    """Complete PDF extractor using Sonnet 4 vision"""
+
+    client_class = Anthropic
+
+    def extract_pdf_with_vision(self, pdf_path, output_path="sonnet4_output", max_workers=None):
+        """Extract PDF content using Sonnet 4 vision
+
+        ``pdf_path`` may be a path, PDF bytes (``bytes``/``bytearray``/
+        ``memoryview``), a binary file-like object, or an already-open
+        ``fitz.Document`` (used as-is and left open). Metadata, page count and
+        rendering are all served from that single open document. With
+        ``output_path=None`` nothing is written to disk.
+
+        Pages come from iter_pages, so rendering overlaps up to
+        ``max_workers`` in-flight vision calls; results are still assembled in
+        page order. Each page entry records whether it came from the text
+        layer or from vision.
+        """
+        doc, owns_doc = None, False
+
+        try:
+            doc, owns_doc = self.open_document(pdf_path)
+            pdf_path = self.document_name(pdf_path, doc)
+            print(f"🔍 Starting PDF extraction: {pdf_path}")
+            if output_path:
+                Path(output_path).mkdir(exist_ok=True)
+            results = self.new_results(pdf_path, self.extract_metadata(doc))
+
+            print(f"📄 Processing {len(doc)} page(s)...")
+
+            with PeakRSSMonitor() as memory:
+                for record in self.iter_pages(doc, max_workers):
+                    self.add_page(results, record)
+            results["peak_rss_mb"] = memory.peak_mb
+            self.join_content(results)
+
+            return self.finish_results(results, output_path)
+
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return None
+        finally:
+            if owns_doc:
+                doc.close()
+
+    def iter_pages(self, pdf_path, max_workers=None, ordered=True):
+        """Yield each page's result as soon as it is ready
+
+        Accepts the same inputs as extract_pdf_with_vision. Rendering overlaps
+        up to ``max_workers`` in-flight vision calls, and at most
+        ``max_buffered_pages`` (default ``max_workers``) encoded page images
+        are held in memory. With ``ordered=False`` pages are yielded in
+        completion order instead of page order.
+        """
+        max_workers = max(1, max_workers or self.max_workers)
+        doc, owns_doc = self.open_document(pdf_path)
+        # Bound rendered-but-unanswered pages so rendering can't run far ahead
+        in_flight = threading.BoundedSemaphore(max(1, self.max_buffered_pages or max_workers))
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        pending = deque()
+
+        def ready():
+            if ordered:
+                while pending and pending[0][2].done():
+                    page_number, page_info, future = pending.popleft()
+                    yield self.page_record(page_number, future.result(), page_info, self.report_type)
+            else:
+                for item in [item for item in pending if item[2].done()]:
+                    pending.remove(item)
+                    page_number, page_info, future = item
+                    yield self.page_record(page_number, future.result(), page_info, self.report_type)
+
+        try:
+            for page_num in range(len(doc)):
+                in_flight.acquire()
+                print(f"   Processing page {page_num + 1}...")
+                page = doc.load_page(page_num)
+                page_info = self.prepare_page(page, **self.page_options)
+
+                future = pool.submit(self.read_page, page_info, page_num + 1)
+                future.add_done_callback(lambda _: in_flight.release())
+                pending.append((page_num + 1, page_info, future))
+                yield from ready()
+
+            while pending:
+                wait([pending[0][2]] if ordered else [item[2] for item in pending], return_when=FIRST_COMPLETED)
+                yield from ready()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            if owns_doc:
+                doc.close()
+
+    def extract_batch(self, sources, output_path="sonnet4_output", render_processes=None, max_in_flight=None):
+        """Extract many PDFs with a shared, concurrency-limited API pool
+
+        ``sources`` is a directory, glob pattern or PDF path (or a list of
+        them). Pages are rendered one at a time in worker processes while
+        vision and summary calls for all documents share one pool of
+        ``max_in_flight`` threads, which is the global cap on concurrent API
+        requests. A page waits for a ``max_buffered_pages`` slot (default
+        ``render_processes + max_in_flight``), shared by every document,
+        before it is rendered and frees it when its vision call finishes, so
+        memory is bounded by pages rather than by whole documents.
+        """
+        pdf_paths = collect_pdf_paths(sources)
+        names = output_names(pdf_paths)
+        print(f"🗂️  Batch extraction: {len(pdf_paths)} PDF(s)")
+        Path(output_path).mkdir(exist_ok=True)
+        max_in_flight = max(1, max_in_flight or self.max_workers)
+        render_processes = render_processes or os.cpu_count() or 1
+
+        # Bound documents in progress, and across all of them the rendered pages
+        # whose encoded image is still held in memory
+        docs_in_progress = threading.BoundedSemaphore(render_processes + max_in_flight)
+        buffered_pages = threading.BoundedSemaphore(max(1, self.max_buffered_pages or render_processes + max_in_flight))
+        processed, failed = [], []
+
+        def queue_page(pdf_path, page_number):
+            """Render a page in a worker, then read it on the API pool; returns a Future of (page_info, content)"""
+            buffered_pages.acquire()
+            page_future = Future()
+
+            def read(page_info):
+                try:
+                    page_future.set_result((page_info, self.read_page(page_info, page_number)))
+                except Exception as e:
+                    page_future.set_exception(e)
+                finally:
+                    buffered_pages.release()
+
+            def rendered(render_future):
+                try:
+                    api_pool.submit(read, render_future.result())
+                except Exception as e:
+                    buffered_pages.release()
+                    page_future.set_exception(e)
+
+            render_pool.submit(_render_pdf_page, pdf_path, page_number, self.page_options).add_done_callback(rendered)
+            return page_future
+
+        def add_queued_page(results, page_number, page_future):
+            page_info, page_content = page_future.result()
+            self.add_page(results, self.page_record(page_number, page_content, page_info, self.report_type))
+
+        def finish_document(pdf_path, info_future):
+            try:
+                with PeakRSSMonitor() as memory:
+                    info = info_future.result()
+                    results = self.new_results(pdf_path, info["metadata"], names[pdf_path])
+                    # Pages are recorded in order, each as soon as it and the pages before it are read
+                    pending = deque()
+                    for page_number in range(1, info["page_count"] + 1):
+                        pending.append((page_number, queue_page(pdf_path, page_number)))
+                        while pending and pending[0][1].done():
+                            add_queued_page(results, *pending.popleft())
+                    while pending:
+                        add_queued_page(results, *pending.popleft())
+                results["peak_rss_mb"] = memory.peak_mb
+                self.join_content(results)
+
+                self.finish_results(results, output_path, api_pool)
+                processed.append(pdf_path)
+            except Exception as e:
+                print(f"❌ Error processing {pdf_path}: {e}")
+                failed.append(pdf_path)
+            finally:
+                docs_in_progress.release()
+
+        with ProcessPoolExecutor(max_workers=render_processes) as render_pool, \
+                ThreadPoolExecutor(max_workers=max_in_flight) as api_pool, \
+                ThreadPoolExecutor(max_workers=render_processes + max_in_flight) as doc_pool:
+            for pdf_path in pdf_paths:
+                if names[pdf_path] is None:
+                    print(f"❌ Error processing {pdf_path}: output name collides with another PDF in the batch")
+                    failed.append(pdf_path)
+                    continue
+                docs_in_progress.acquire()
+                info_future = render_pool.submit(_pdf_info, pdf_path)
+                doc_pool.submit(finish_document, pdf_path, info_future)
+
+        print(f"🎉 Batch complete: {len(processed)} succeeded, {len(failed)} failed")
+        return {"processed": processed, "failed": failed}
+
+    def submit_message_batches(self, sources, output_path="sonnet4_output", render_processes=None,
+                               max_batch_requests=10000, max_batch_bytes=200 * 1024 * 1024):
+        """Render PDFs and submit their page vision requests as Message Batches
+
+        Nothing waits on the API here: batch IDs and per-page bookkeeping are
+        persisted to <output_path>/message_batches.json, which
+        collect_message_batches picks up later. Text-layer pages and page
+        cache hits are resolved immediately and never submitted.
+        """
+        pdf_paths = collect_pdf_paths(sources)
+        names = output_names(pdf_paths)
+        for pdf_path in [pdf_path for pdf_path in pdf_paths if names[pdf_path] is None]:
+            print(f"❌ Skipping {pdf_path}: output name collides with another PDF in the batch")
+            pdf_paths.remove(pdf_path)
+        print(f"📮 Preparing Message Batches for {len(pdf_paths)} PDF(s)")
+        Path(output_path).mkdir(exist_ok=True)
+        state_file = Path(output_path) / "message_batches.json"
+        state = {"output_path": output_path, "batches": [], "documents": {}}
+        chunk, chunk_bytes = [], 0
+        render_processes = render_processes or os.cpu_count() or 1
+
+        def submit_chunk():
+            nonlocal chunk, chunk_bytes
+            if chunk:
+                batch = self.client.messages.batches.create(requests=chunk)
+                state["batches"].append(batch.id)
+                print(f"   📤 Submitted batch {batch.id} with {len(chunk)} request(s)")
+                self.save_batch_state(state, state_file)
+            chunk, chunk_bytes = [], 0
+
+        with ProcessPoolExecutor(max_workers=render_processes) as render_pool:
+            # Keep a bounded window of documents rendering ahead of submission
+            window = deque()
+            remaining = iter(enumerate(pdf_paths))
+            for doc_index, pdf_path in remaining:
+                window.append((doc_index, pdf_path, render_pool.submit(_render_pdf, pdf_path, self.page_options)))
+                if len(window) >= render_processes * 2:
+                    break
+            while window:
+                doc_index, pdf_path, render_future = window.popleft()
+                for next_index, next_path in remaining:
+                    window.append((next_index, next_path, render_pool.submit(_render_pdf, next_path, self.page_options)))
+                    break
+                try:
+                    rendered = render_future.result()
+                except Exception as e:
+                    print(f"❌ Error rendering {pdf_path}: {e}")
+                    continue
+
+                doc_id = f"d{doc_index}"
+                for page_number, page_info in enumerate(rendered["pages"], start=1):
+                    if "text" in page_info:
+                        page_info["content"] = page_info.pop("text")
+                        continue
+                    img_b64 = page_info.pop("img_b64")
+                    request = self.build_vision_request(img_b64, page_number, page_info["media_type"])
+                    cache_key = self.page_cache.key_for(request) if self.page_cache else None
+                    cached = self.page_cache.get(cache_key) if cache_key else None
+                    if cached is not None:
+                        try:
+                            page_info["content"] = self.decode_page(cached)
+                            continue
+                        except PageExtractionError:
+                            pass
+
+                    request_bytes = len(img_b64) + 4096
+                    if chunk and (len(chunk) >= max_batch_requests or chunk_bytes + request_bytes > max_batch_bytes):
+                        submit_chunk()
+                    page_info["custom_id"] = f"{doc_id}-p{page_number}"
+                    page_info["cache_key"] = cache_key
+                    chunk.append({"custom_id": page_info["custom_id"], "params": request})
+                    chunk_bytes += request_bytes
+
+                state["documents"][doc_id] = {"pdf_path": pdf_path, "output_name": names[pdf_path], **rendered}
+            submit_chunk()
+
+        self.save_batch_state(state, state_file)
+        print(f"💾 Saved batch state: {state_file} ({len(state['batches'])} batch(es))")
+        return str(state_file)
+
+    def collect_message_batches(self, state_file="sonnet4_output/message_batches.json", poll_interval=60):
+        """Wait for submitted Message Batches, then summarize, parse and save each document"""
+        with open(state_file, encoding="utf-8") as f:
+            state = json.load(f)
+        output_path = state["output_path"]
+
+        contents, errors, usages = {}, {}, {}
+        for batch_id in state["batches"]:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            while batch.processing_status != "ended":
+                print(f"   ⏳ Batch {batch_id}: {batch.request_counts.processing} request(s) processing")
+                time.sleep(poll_interval)
+                batch = self.client.messages.batches.retrieve(batch_id)
+            for entry in self.client.messages.batches.results(batch_id):
+                if entry.result.type == "succeeded":
+                    contents[entry.custom_id] = self.response_text(entry.result.message)
+                    usages[entry.custom_id] = usage_counts(entry.result.message)
+                else:
+                    error = getattr(entry.result, "error", None)
+                    errors[entry.custom_id] = f"Batch request {entry.result.type}: {error}" if error else \
+                        f"Batch request {entry.result.type}"
+            print(f"   ✅ Batch {batch_id} collected")
+
+        def finish_document(document):
+            results = self.new_results(document["pdf_path"], document["metadata"], document.get("output_name"))
+            for page_number, page_info in enumerate(document["pages"], start=1):
+                page_content = page_info.pop("content", None)
+                custom_id = page_info.pop("custom_id", None)
+                cache_key = page_info.pop("cache_key", None)
+                if custom_id:
+                    page_content = contents.get(custom_id)
+                    page_info["usage"] = usages.get(custom_id, {})
+                    if page_content is None:
+                        page_info["error"] = errors.get(custom_id, "Missing from batch results")
+                    else:
+                        try:
+                            decoded = self.decode_page(page_content)
+                            if cache_key and self.page_cache:
+                                self.page_cache.put(cache_key, page_content)
+                        except PageExtractionError as e:
+                            page_info["error"] = str(e)
+                            decoded = None
+                        page_content = decoded
+                self.add_page(results, self.page_record(page_number, page_content, page_info, self.report_type))
+            self.join_content(results)
+
+            return self.finish_results(results, output_path)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            finished = list(pool.map(finish_document, state["documents"].values()))
+        print(f"🎉 Collected {len(finished)} document(s) from {len(state['batches'])} batch(es)")
+        return finished
+
+    @staticmethod
+    def save_batch_state(state, state_file):
+        tmp_file = f"{state_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_file, state_file)
+
+    def finish_results(self, results, output_path, api_pool=None):
+        """Summarize, then merge and save the structured data, as a small dependency graph
+
+        The summary needs only full_content, so it runs while the pages are
+        merged and written; the structured JSON is saved as soon as the merge
+        is done. With ``api_pool`` (batch mode) the summary's API calls go
+        through that shared pool.
+        """
+        results["usage"] = self.usage_totals(results["pages"])
+        with ThreadPoolExecutor(max_workers=1) as summary_pool:
+            summary = summary_pool.submit(self.generate_summary, results["full_content"], api_pool,
+                                          self.collect_page_summaries(results))
+            self.write_outputs(results, output_path)
+            results["summary"] = summary.result()
+        return results
+
+    def read_page(self, page_info, page_number):
+        """Return a prepared page's content, calling the vision model for scans
+
+        Returns None and records the error in ``page_info`` if the page failed.
+        """
+        if "text" in page_info:
+            print(f"   📝 Using text layer for page {page_number}")
+            return page_info.pop("text")
+        try:
+            page_info["usage"] = {}
+            return self.analyze_page_vision(page_info.pop("img_b64"), page_number, page_info["media_type"], page_info["usage"])
+        except PageExtractionError as e:
+            page_info["error"] = str(e)
+            return None
+
+    def analyze_page_vision(self, img_b64, page_num, media_type="image/png", usage=None):
+        """Analyze page image with Sonnet 4 vision
+
+        Token counts of the API call (none on a page cache hit) are written
+        into the ``usage`` dict when one is given.
+        """
+        request = self.build_vision_request(img_b64, page_num, media_type)
+        cache_key = self.page_cache.key_for(request) if self.page_cache else None
+        if cache_key:
+            content = self.page_cache.get(cache_key)
+            if content is not None:
+                print(f"   ♻️  Cache hit for page {page_num}")
+                return self.decode_page(content)
+        try:
+            response = self.create_message(request)
+            content = self.response_text(response)
+            if usage is not None:
+                usage.update(usage_counts(response))
+            page = self.decode_page(content)
+            print(f"   ✅ Extracted {len(content)} characters from page {page_num}")
+            if cache_key:
+                self.page_cache.put(cache_key, content)
+            return page
+        except Exception as e:
+            print(f"   ❌ Vision analysis failed for page {page_num}: {e}")
+            raise PageExtractionError(f"Error analyzing page {page_num}: {str(e)}") from e
+
+    def create_message(self, request):
+        """Call messages.create with rate limiting and jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                return self.client.messages.create(**request)
+            except Exception as e:
+                delay = retry_delay(e, attempt)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                if self.rate_limiter and getattr(e, "status_code", None) == 429:
+                    self.rate_limiter.pause(delay)
+                print(f"   ⏳ {e.__class__.__name__}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def generate_summary(self, content, pool=None, page_summaries=None):
+        """Summarize the whole document, map-reducing over chunks when it doesn't fit one prompt
+
+        Pages are packed into chunks of at most ``summary_chunk_tokens``.
+        Chunks are summarized in parallel (map) and the chunk summaries are
+        combined by one final call (reduce), level by level if they still
+        don't fit. ``page_summaries`` from the vision calls replace the map
+        stage, and a single one is returned as is. API calls run on ``pool``
+        when given.
+        """
+        if page_summaries and len(page_summaries) == 1:
+            return page_summaries[0]
+        if not content or len(content.strip()) < 50:
+            return "No substantial content found for summary."
+        own_pool = pool is None
+        if own_pool:
+            pool = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+        try:
+            chunks, from_parts = self.first_summary_chunks(content, page_summaries)
+            while len(chunks) > 1:
+                summaries = list(pool.map(self.summarize_chunk, chunks))
+                chunks, from_parts = self.reduce_chunks(summaries), True
+            response = pool.submit(self.create_message, self.build_summary_request(chunks[0], from_parts)).result()
+            return response.content[0].text
+        except Exception as e:
+            return f"Summary generation failed: {str(e)}"
+        finally:
+            if own_pool:
+                pool.shutdown()
+
+    def summarize_chunk(self, chunk):
+        """Map step: summarize one chunk of pages"""
+        return self.create_message(self.build_chunk_summary_request(chunk)).content[0].text
+
+
+class AsyncCompletePDFExtractor(PDFExtractorBase):
+    """Asyncio variant of CompletePDFExtractor built on AsyncAnthropic
+
+    Vision calls from every document handled by one instance share a single
+    in-flight limit, so many documents can be extracted on one event loop.
+    PyMuPDF is not thread-safe, so all fitz work runs on one dedicated thread.
+    The process-pool batch and Message Batches modes are only on
+    CompletePDFExtractor.
+    """
+
+    client_class = AsyncAnthropic
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._in_flight = asyncio.Semaphore(max(1, self.max_workers))
+        self._buffered_pages = asyncio.Semaphore(max(1, self.max_buffered_pages or self.max_workers))
+        self._fitz_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fitz")
+
+    async def _run_fitz(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._fitz_executor, func, *args)
+
+    async def extract_pdf_with_vision(self, pdf_path, output_path="sonnet4_output"):
+        """Extract PDF content using Sonnet 4 vision"""
+        doc, owns_doc = None, False
+
+        try:
+            doc, owns_doc = await self._run_fitz(self.open_document, pdf_path)
+            pdf_path = self.document_name(pdf_path, doc)
+            print(f"🔍 Starting PDF extraction: {pdf_path}")
+            if output_path:
+                Path(output_path).mkdir(exist_ok=True)
+            results = self.new_results(pdf_path, await self._run_fitz(self.extract_metadata, doc))
+
+            print(f"📄 Processing {len(doc)} page(s)...")
+
+            with PeakRSSMonitor() as memory:
+                async for record in self.iter_pages(doc):
+                    self.add_page(results, record)
+            results["peak_rss_mb"] = memory.peak_mb
+            self.join_content(results)
+
+            results["usage"] = self.usage_totals(results["pages"])
+            # The summary call overlaps merging and writing the outputs
+            results["summary"], _ = await asyncio.gather(
+                self.generate_summary(results["full_content"], page_summaries=self.collect_page_summaries(results)),
+                asyncio.to_thread(self.write_outputs, results, output_path)
+            )
+            return results
+
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return None
+        finally:
+            if owns_doc:
+                await self._run_fitz(doc.close)
+
+    async def iter_pages(self, pdf_path, ordered=True):
+        """Yield each page's result as soon as it is ready
+
+        Async counterpart of CompletePDFExtractor.iter_pages. Pages wait on a
+        buffer semaphore shared by every document before rendering, so at
+        most ``max_buffered_pages`` (default ``max_workers``) page images
+        exist at once; API calls are separately capped at ``max_workers``.
+        """
+        doc, owns_doc = await self._run_fitz(self.open_document, pdf_path)
+
+        async def process_page(page_num):
+            async with self._buffered_pages:
+                print(f"   Processing page {page_num + 1}...")
+                page = await self._run_fitz(doc.load_page, page_num)
+                page_info = await self._run_fitz(lambda: self.prepare_page(page, **self.page_options))
+                page_content = await self.read_page(page_info, page_num + 1)
+            return self.page_record(page_num + 1, page_content, page_info, self.report_type)
+
+        tasks = [asyncio.ensure_future(process_page(n)) for n in range(len(doc))]
+        try:
+            for task in (tasks if ordered else asyncio.as_completed(tasks)):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if owns_doc:
+                await self._run_fitz(doc.close)
+
+    async def read_page(self, page_info, page_number):
+        """Return a prepared page's content, calling the vision model for scans"""
+        if "text" in page_info:
+            print(f"   📝 Using text layer for page {page_number}")
+            return page_info.pop("text")
+        try:
+            page_info["usage"] = {}
+            return await self.analyze_page_vision(page_info.pop("img_b64"), page_number, page_info["media_type"],
+                                                  page_info["usage"])
+        except PageExtractionError as e:
+            page_info["error"] = str(e)
+            return None
+
+    async def summarize_chunk(self, chunk):
+        response = await self.create_message(self.build_chunk_summary_request(chunk))
+        return response.content[0].text
+
+    async def create_message(self, request):
+        """Call messages.create with rate limiting and jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async()
+            try:
+                async with self._in_flight:
+                    return await self.client.messages.create(**request)
+            except Exception as e:
+                delay = retry_delay(e, attempt)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                if self.rate_limiter and getattr(e, "status_code", None) == 429:
+                    self.rate_limiter.pause(delay)
+                print(f"   ⏳ {e.__class__.__name__}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+    async def analyze_page_vision(self, img_b64, page_num, media_type="image/png", usage=None):
+        """Analyze page image with Sonnet 4 vision"""
+        request = self.build_vision_request(img_b64, page_num, media_type)
+        cache_key = self.page_cache.key_for(request) if self.page_cache else None
+        if cache_key:
+            content = await asyncio.to_thread(self.page_cache.get, cache_key)
+            if content is not None:
+                print(f"   ♻️  Cache hit for page {page_num}")
+                return self.decode_page(content)
+        try:
+            response = await self.create_message(request)
+            content = self.response_text(response)
+            if usage is not None:
+                usage.update(usage_counts(response))
+            page = self.decode_page(content)
+            print(f"   ✅ Extracted {len(content)} characters from page {page_num}")
+            if cache_key:
+                await asyncio.to_thread(self.page_cache.put, cache_key, content)
+            return page
+        except Exception as e:
+            print(f"   ❌ Vision analysis failed for page {page_num}: {e}")
+            raise PageExtractionError(f"Error analyzing page {page_num}: {str(e)}") from e
+
+    async def generate_summary(self, content, pool=None, page_summaries=None):
+        """Async counterpart of CompletePDFExtractor.generate_summary; map calls run as concurrent tasks"""
+        if page_summaries and len(page_summaries) == 1:
+            return page_summaries[0]
+        if not content or len(content.strip()) < 50:
+            return "No substantial content found for summary."
+        try:
+            chunks, from_parts = self.first_summary_chunks(content, page_summaries)
+            while len(chunks) > 1:
+                summaries = await asyncio.gather(*(self.summarize_chunk(chunk) for chunk in chunks))
+                chunks, from_parts = self.reduce_chunks(summaries), True
+            response = await self.create_message(self.build_summary_request(chunks[0], from_parts))
+            return response.content[0].text
+        except Exception as e:
+            return f"Summary generation failed: {str(e)}"
+
+
+def collect_pdf_paths(sources):
+    """Expand directories, glob patterns and file paths into a sorted list of PDFs"""
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    pdf_paths = set()
+    for source in sources:
+        source = str(source)
+        if Path(source).is_dir():
+            pdf_paths.update(str(p) for p in Path(source).rglob("*.pdf"))
+        elif glob.has_magic(source):
+            pdf_paths.update(p for p in glob.glob(source, recursive=True) if p.lower().endswith(".pdf"))
+        elif Path(source).is_file():
+            pdf_paths.add(source)
+        else:
+            print(f"⚠️  No PDFs found for {source}")
+    return sorted(pdf_paths)
+
+
+def output_names(pdf_paths):
+    """Map each PDF to the base name of its output files
+
+    Names are the path relative to the directory all the PDFs share, without
+    the suffix and with separators escaped as "__", so a/report.pdf and
+    b/report.pdf don't overwrite each other. PDFs whose names still collide
+    (e.g. a__report.pdf next to a/report.pdf) map to None.
+    """
+    if not pdf_paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in pdf_paths])
+    names = {p: "__".join(Path(os.path.relpath(os.path.abspath(p), root)).with_suffix("").parts) for p in pdf_paths}
+    # Compare case-insensitively so outputs don't clash on case-insensitive filesystems
+    counts = {}
+    for name in names.values():
+        counts[name.casefold()] = counts.get(name.casefold(), 0) + 1
+    return {p: name if counts[name.casefold()] == 1 else None for p, name in names.items()}
+
+
+# Documents each render worker process keeps open, so a PDF isn't reopened for every page
+_WORKER_DOCS = OrderedDict()
+_WORKER_MAX_DOCS = 8
+
+
+def _worker_document(pdf_path):
+    """Open a PDF in a render worker, reusing the most recently used documents"""
+    doc = _WORKER_DOCS.pop(pdf_path, None)
+    if doc is None:
+        doc = fitz.open(pdf_path)
+        while len(_WORKER_DOCS) >= _WORKER_MAX_DOCS:
+            _WORKER_DOCS.popitem(last=False)[1].close()
+    _WORKER_DOCS[pdf_path] = doc
+    return doc
+
+
+def _pdf_info(pdf_path):
+    """Metadata and page count of a PDF, read in a worker process"""
+    doc = _worker_document(pdf_path)
+    return {"metadata": CompletePDFExtractor.extract_metadata(doc), "page_count": len(doc)}
+
+
+def _render_pdf_page(pdf_path, page_number, page_options):
+    """Prepare one page (1-based) of a PDF in a worker process"""
+    return CompletePDFExtractor.prepare_page(_worker_document(pdf_path).load_page(page_number - 1), **page_options)
+
+
+def _render_pdf(pdf_path, page_options):
+    """Render every page of a PDF in a worker process"""
+    doc = fitz.open(pdf_path)
+    try:
+        metadata = CompletePDFExtractor.extract_metadata(doc)
+        pages = [CompletePDFExtractor.prepare_page(page, **page_options) for page in doc]
+    finally:
+        doc.close()
+    return {"metadata": metadata, "pages": pages}
+
+
+def _legacy_parse_page_content_to_json(page_content):
+    """Original regex-per-field parser, kept as the reference for benchmark_parser"""
+    data = {
+        "document_info": {},
+        "instrument_settings": {},
+        "instrument_info": {},
+        "sample_data": {"standard_curve_wells": [], "control_and_sample_wells": []},
+        "standards_table": {"headers": [], "data": []},
+        "key_calculation": None,
+        "full_content": page_content
+    }
+
+    # Document Info
+    doc_title = re.search(r"# Document Analysis - (.+)", page_content)
+    if doc_title:
+        data["document_info"]["title"] = doc_title.group(1).strip()
+
+    title = re.search(r"\*\*Title:\*\* (.+)", page_content)
+    if title:
+        data["document_info"]["document_title"] = title.group(1).strip()
+
+    qc = re.search(r"QC Verified Protocols/(.+?) - Document Status", page_content)
+    if qc:
+        data["document_info"]["qc_protocol"] = qc.group(1).strip()
+
+    status = re.search(r"Document Status: (\w+)", page_content)
+    if status:
+        data["document_info"]["status"] = status.group(1).strip()
+
+    date = re.search(r"\*\*(\d{2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}:\d{2})\*\*", page_content)
+    if date:
+        data["document_info"]["date"] = date.group(1)
+
+    # Instrument Settings
+    wl_comb = re.search(r"\*\*Wavelength Combination:\*\* (\w+)", page_content)
+    if wl_comb:
+        data["instrument_settings"]["wavelength_combination"] = wl_comb.group(1)
+
+    # Instrument Info
+    instr = re.search(r"\*\*Instrument:\*\* (.+)", page_content)
+    if instr:
+        data["instrument_info"]["instrument"] = instr.group(1).strip()
+
+    rom = re.search(r"\*\*ROM:\*\* (.+)", page_content)
+    if rom:
+        data["instrument_info"]["rom"] = rom.group(1).strip()
+
+    start_read = re.search(r"\*\*Start Read:\*\* (.+)", page_content)
+    if start_read:
+        data["instrument_info"]["start_read"] = start_read.group(1).strip()
+
+    temp = re.search(r"\*\*Mean Temperature:\*\* ([\d\.]+)°C", page_content)
+    if temp:
+        data["instrument_info"]["mean_temperature"] = temp.group(1) + "°C"
+
+    operator = re.search(r"\*\*Read By:\*\* (.+)", page_content, re.IGNORECASE)
+    if operator:
+        data["instrument_info"]["operator"] = operator.group(1).strip()
+
+    # Sample Data: Standard Wells (A1-A6)
+    stds = re.findall(r"- \*\*(A\d)\*\*: ([\d\.]+) Std - ([\d\.e,]+) \(Reduced: ([\d\.e,]+)\) - Date: ([\d\-: ]+)", page_content)
+    for well, conc, val, red, date in stds:
+        data["sample_data"]["standard_curve_wells"].append({
+            "well": well,
+            "concentration": float(conc),
+            "fluorescence_value": float(val.replace(',', '')),
+            "reduced_value": float(red.replace(',', '')),
+            "date": date
+        })
+
+    # Control and Sample Wells (B1-B8)
+    controls = re.findall(r"- \*\*(B\d)\*\*: (.+?) - (?:(?P<val>[\d\.e,]+) \(Reduced: (?P<red>[\d\.e,]+)\) - Date: (?P<date>[\d\-: ]+)|Date: No Data)", page_content)
+    for c in controls:
+        well, sample, val, red, date = c
+        data["sample_data"]["control_and_sample_wells"].append({
+            "well": well,
+            "sample_type": sample.strip(),
+            "fluorescence_value": float(val.replace(',', '')) if val else None,
+            "reduced_value": float(red.replace(',', '')) if red else None,
+            "date": date if date else None
+        })
+
+    # Standards Table
+    table_match = re.search(r"## Standards Table\n(.+?)\n\n", page_content, re.DOTALL)
+    if table_match:
+        table_lines = table_match.group(1).strip().split("\n")
+        headers = [h.strip() for h in table_lines[0].split("|")[1:-1]]
+        data["standards_table"]["headers"] = headers
+        for line in table_lines[2:]:
+            cols = [c.strip() for c in line.split("|")[1:-1]]
+            row = {}
+            for i, h in enumerate(headers):
+                try:
+                    row[h] = float(cols[i].replace(',', ''))
+                except:
+                    row[h] = cols[i]
+            data["standards_table"]["data"].append(row)
+
+    # Key Calculation
+    key_calc = re.search(r"## Key Calculations\n\*\*(.+)\*\*", page_content)
+    if key_calc:
+        data["key_calculation"] = key_calc.group(1).strip()
+
+    return data
+
+
+def _reparse_file(content_file, output_path, report_type="plate_reader"):
+    """Regenerate structured JSON and the CSVs for one saved extraction"""
+    content_file = Path(content_file)
+    if content_file.name.endswith("_extracted_content.txt"):
+        base_name = content_file.name[:-len("_extracted_content.txt")]
+        full_content = content_file.read_text(encoding="utf-8")
+    else:
+        base_name = content_file.name[:-len("_structured.json")]
+        with open(content_file, encoding="utf-8") as f:
+            full_content = json.load(f)["full_content"]
+
+    pages = CompletePDFExtractor.split_pages(full_content, report_type)
+    results = {
+        "pdf_path": base_name,
+        "output_name": base_name,
+        "full_content": full_content,
+        "structured_data": CompletePDFExtractor.merge_page_data(pages, full_content, report_type)
+    }
+    CompletePDFExtractor.save_json(results, output_path)
+    CompletePDFExtractor.save_as_csv(results, f"{output_path}/{base_name}_structured_data.csv")
+    CompletePDFExtractor.merge_plates(pages).to_csv(f"{output_path}/{base_name}_plate_wells.csv", index=False)
+    return base_name
+
+
+def reparse(output_path="sonnet4_output", processes=None, report_type="plate_reader"):
+    """Re-run the per-page parse over every saved extraction in output_path
+
+    Reads <stem>_extracted_content.txt (or the full_content field of
+    <stem>_structured.json when the TXT is missing) and rewrites the
+    structured JSON and CSV without rendering or calling the API.
+    """
+    content_files = {}
+    for json_file in Path(output_path).glob("*_structured.json"):
+        content_files[json_file.name[:-len("_structured.json")]] = json_file
+    for txt_file in Path(output_path).glob("*_extracted_content.txt"):
+        content_files[txt_file.name[:-len("_extracted_content.txt")]] = txt_file
+
+    if not content_files:
+        print(f"❌ No saved extractions found in {output_path}/")
+        return []
+
+    print(f"🔁 Re-parsing {len(content_files)} document(s) in {output_path}/")
+    paths = [str(path) for _, path in sorted(content_files.items())]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        chunksize = max(1, len(paths) // ((processes or os.cpu_count() or 1) * 4))
+        reparsed = list(pool.map(_reparse_file, paths, [output_path] * len(paths), [report_type] * len(paths), chunksize=chunksize))
+    print(f"🎉 Re-parsed {len(reparsed)} document(s)")
+    return reparsed
+
+
+ENCODING_BENCHMARKS = [
+    {"image_format": "png", "grayscale": False},
+    {"image_format": "png", "grayscale": True},
+    {"image_format": "jpeg", "grayscale": False, "jpeg_quality": 85},
+    {"image_format": "jpeg", "grayscale": True, "jpeg_quality": 85},
+    {"image_format": "jpeg", "grayscale": True, "jpeg_quality": 70},
+]
+
+
+def _flatten_fields(data, prefix=""):
+    """Flatten structured data into {dotted.path: value} for accuracy comparison"""
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        return {prefix: data}
+    fields = {}
+    for key, value in items:
+        fields.update(_flatten_fields(value, f"{prefix}.{key}" if prefix else str(key)))
+    return fields
+
+
+def benchmark_encodings(pdf_path="pg1.pdf", extractor=None, repeat=3):
+    """Compare encode time, payload size and (optionally) extraction accuracy per encoding
+
+    With an extractor, every encoding of the first page is sent through
+    analyze_page_vision and its structured fields are compared against the
+    RGB PNG baseline.
+    """
+    doc = fitz.open(pdf_path)
+    page = doc.load_page(0)
+    rows = []
+    baseline_fields = None
+    for options in ENCODING_BENCHMARKS:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            rendered = CompletePDFExtractor.render_page(page, **options)
+        row = {
+            "encoding": f"{options['image_format']}{' q' + str(options['jpeg_quality']) if 'jpeg_quality' in options else ''}"
+                        f"{' gray' if options['grayscale'] else ' rgb'}",
+            "encode_ms": round((time.perf_counter() - start) / repeat * 1000, 1),
+            "image_bytes": rendered["image_size"],
+            "base64_bytes": len(rendered["img_b64"])
+        }
+        if extractor:
+            content = extractor.analyze_page_vision(rendered["img_b64"], 1, rendered["media_type"])
+            if isinstance(content, dict):
+                structured = dict(content)
+                structured.pop("content")
+            else:
+                structured = CompletePDFExtractor.parse_page_content_to_json(content)
+                structured.pop("full_content")
+            fields = _flatten_fields(structured)
+            if baseline_fields is None:
+                baseline_fields = fields
+            matched = sum(1 for k, v in baseline_fields.items() if fields.get(k) == v)
+            row["field_accuracy"] = round(matched / len(baseline_fields), 3) if baseline_fields else None
+        rows.append(row)
+    doc.close()
+
+    print(f"📏 Encoding benchmark: {pdf_path} (page 1)")
+    for row in rows:
+        print("   " + "  ".join(f"{k}={v}" for k, v in row.items()))
+    return rows
+
+
+def benchmark_encoding_memory(pdf_path="pg1.pdf"):
+    """Compare Python-level bytes allocated per page by the old and current encode paths
+
+    Measures tracemalloc's peak while rendering, base64-encoding and
+    computing the page cache key for each page. MuPDF's own pixmap memory
+    isn't visible to tracemalloc and is the same for both paths.
+    """
+    import tracemalloc
+
+    def legacy(page):
+        pix = page.get_pixmap(matrix=fitz.Matrix(2.5, 2.5))
+        img_data = pix.tobytes("png")
+        img_b64 = base64.b64encode(img_data).decode()
+        hashlib.sha256(img_b64.encode()).hexdigest()
+        return img_b64
+
+    def current(page):
+        rendered = CompletePDFExtractor.render_page(page, long_edge=None)
+        request = {"model": "", "max_tokens": 0, "messages": [{"role": "user", "content": [
+            {"type": "image", "source": {"type": "base64", "media_type": rendered["media_type"],
+                                         "data": rendered["img_b64"]}}]}]}
+        PageCache.key_for(request)
+        return rendered["img_b64"]
+
+    doc = fitz.open(pdf_path)
+    print(f"📏 Encoding memory benchmark: {pdf_path}")
+    rows = []
+    for page in doc:
+        row = {"page": page.number + 1}
+        for name, encode in (("before", legacy), ("after", current)):
+            tracemalloc.start()
+            img_b64 = encode(page)
+            row[f"{name}_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        row["base64_bytes"] = len(img_b64)
+        rows.append(row)
+        print("   " + "  ".join(f"{k}={v}" for k, v in row.items()))
+    doc.close()
+    return rows
+
+
+def benchmark_full_content(page_counts=(250, 500, 1000, 2000), page_chars=2400):
+    """Time building full_content by repeated += versus a single join
+
+    Uses synthetic pages the size of a typical plate-reader page; the join
+    path should scale linearly with page count.
+    """
+    page_text = ("x" * 79 + "\n") * (page_chars // 80)
+    print(f"📏 full_content benchmark ({page_chars} chars/page)")
+    rows = []
+    for page_count in page_counts:
+        records = [CompletePDFExtractor.page_record(n, page_text, {}) for n in range(1, page_count + 1)]
+
+        start = time.perf_counter()
+        legacy = {"full_content": ""}
+        for record in records:
+            legacy["full_content"] += f"\n\n=== PAGE {record['page_number']} ===\n{record['content']}"
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = CompletePDFExtractor.new_results("synthetic.pdf", {})
+        for record in records:
+            CompletePDFExtractor.add_page(results, record)
+        CompletePDFExtractor.join_content(results)
+        after = time.perf_counter() - start
+
+        assert results["full_content"] == legacy["full_content"]
+        rows.append({"pages": page_count, "concat_ms": round(before * 1000, 1), "join_ms": round(after * 1000, 1)})
+        print("   " + "  ".join(f"{k}={v}" for k, v in rows[-1].items()))
+    return rows
+
+
+def benchmark_parser(content_file="../outputs/pg1_extracted_content.txt", page_counts=(1, 10, 100, 1000), repeat=3):
+    """Time the precompiled parser against the original regex-per-field parser
+
+    Builds multi-page documents by repeating a saved page and checks that
+    both parsers produce the same output.
+    """
+    page = Path(content_file).read_text(encoding="utf-8").split("=== PAGE 1 ===\n", 1)[-1]
+    print(f"📏 Parser benchmark: {content_file} ({len(page)} chars/page)")
+    rows = []
+    for page_count in page_counts:
+        content = "".join(f"\n\n=== PAGE {n} ===\n{page}" for n in range(1, page_count + 1))
+        timings = {}
+        for name, parse in (("regex_ms", _legacy_parse_page_content_to_json),
+                            ("precompiled_ms", CompletePDFExtractor.parse_page_content_to_json)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                parsed = parse(content)
+            timings[name] = round((time.perf_counter() - start) / repeat * 1000, 2)
+            timings.setdefault("outputs", []).append(parsed)
+        legacy, current = timings.pop("outputs")
+        assert legacy == current, "parsers disagree"
+        rows.append({"pages": page_count, **timings})
+        print("   " + "  ".join(f"{k}={v}" for k, v in rows[-1].items()))
+    return rows
+
+
 def main():
     pdf_path = "pg1.pdf"
     output_path = "sonnet4_output"
+    max_workers = 4
+    cache_dir = "sonnet4_cache"
 
     print("🚀 Starting Complete PDF Extraction with Sonnet 4")
     print("=" * 70)
 
-    extractor = CompletePDFExtractor()
+    extractor = CompletePDFExtractor(max_workers=max_workers, cache_dir=cache_dir)
     results = extractor.extract_pdf_with_vision(pdf_path, output_path)
 
     if results:
@@ -291,7 +2121,13 @@ def main():
         print(f"📄 PDF: {pdf_path}")
         print(f"📊 Pages: {len(results['pages'])}")
         print(f"📝 Content: {len(results['full_content'])} characters")
+        print(f"🧠 Peak RSS: {results['peak_rss_mb']} MB")
+        print(f"🔢 Tokens: {results['usage']}")
+        if results["failed_pages"]:
+            print(f"⚠️  Failed pages: {results['failed_pages']}")
         print(f"📁 Output: {output_path}/")
+        if extractor.page_cache:
+            print(f"♻️  Page cache: {extractor.page_cache.stats()}")
         print("\n📖 Content Preview:")
         print("-" * 50)
         preview = results['full_content'][:500] + "..." if len(results['full_content']) > 500 else results['full_content']
@@ -300,8 +2136,37 @@ def main():
         print("❌ Extraction failed")
 
 
+def batch_main(sources, output_path="sonnet4_output"):
+    print("🚀 Starting Batch PDF Extraction with Sonnet 4")
+    print("=" * 70)
+
+    extractor = CompletePDFExtractor(max_workers=8, cache_dir="sonnet4_cache")
+    summary = extractor.extract_batch(sources, output_path, max_in_flight=8)
+
+    print(f"📁 Output: {output_path}/")
+    for pdf_path in summary["failed"]:
+        print(f"   ❌ {pdf_path}")
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["reparse"]:
+        reparse(*sys.argv[2:3], report_type=sys.argv[3] if len(sys.argv) > 3 else "plate_reader")
+    elif sys.argv[1:2] == ["batch"] and len(sys.argv) > 2:
+        batch_main(*sys.argv[2:4])
+    elif sys.argv[1:2] == ["batch-submit"] and len(sys.argv) > 2:
+        CompletePDFExtractor(cache_dir="sonnet4_cache").submit_message_batches(*sys.argv[2:4])
+    elif sys.argv[1:2] == ["batch-collect"]:
+        CompletePDFExtractor(cache_dir="sonnet4_cache").collect_message_batches(*sys.argv[2:3])
+    elif sys.argv[1:2] == ["bench-encodings"]:
+        benchmark_encodings(*sys.argv[2:3])
+    elif sys.argv[1:2] == ["bench-memory"]:
+        benchmark_encoding_memory(*sys.argv[2:3])
+    elif sys.argv[1:2] == ["bench-content"]:
+        benchmark_full_content()
+    elif sys.argv[1:2] == ["bench-parser"]:
+        benchmark_parser(*sys.argv[2:3])
+    else:
+        main()
 
 
 
@@ -0,0 +1,89 @@
+from complete_pdf_extractor_1 import CompletePDFExtractor, _legacy_parse_page_content_to_json
+
+STANDARDS_TABLE = "## Standards Table\n| Std | Value |\n|---|---|\n| 1 | 1,200 |\n| 2 | 2,400 |"
+
+
+def test_standards_table_ending_a_page_is_parsed():
+    full_content = f"\n\n=== PAGE 1 ===\n{STANDARDS_TABLE}\n\n=== PAGE 2 ===\n## Key Calculations\n**EC50 = 1.5**"
+    pages = CompletePDFExtractor.split_pages(full_content)
+    merged = CompletePDFExtractor.merge_page_data(pages, full_content)
+
+    expected = _legacy_parse_page_content_to_json(full_content)["standards_table"]
+    assert expected["data"] == [{"Std": 1.0, "Value": 1200.0}, {"Std": 2.0, "Value": 2400.0}]
+    assert merged["standards_table"] == expected
+    assert merged["source_pages"]["standards_table"] == 1
+
+
+def test_standards_table_before_page_summary_is_parsed():
+    page = f"{STANDARDS_TABLE}\n\n=== PAGE SUMMARY ===\nA standards table."
+    record = CompletePDFExtractor.page_record(1, page, {})
+
+    assert record["page_summary"] == "A standards table."
+    assert record["structured_data"]["standards_table"]["headers"] == ["Std", "Value"]
+    assert len(record["structured_data"]["standards_table"]["data"]) == 2
+
+
+def test_row_parser_matches_the_field_converters():
+    from complete_pdf_extractor_1 import FIELD_CONVERTERS, compile_row_parser
+    import re
+
+    columns = (("well", "str"), ("sample_type", "strip"), ("value", "optional_number"), ("date", "optional_str"))
+    pattern = re.compile(r"(\w+);([^;]*);([\d,\.]*);(.*)")
+    matches = pattern.findall("B1; Blank ;1,250.5;2024-01-01\nB2;Sample;;")
+    expected = [{name: FIELD_CONVERTERS[converter](value) for (name, converter), value in zip(columns, match)}
+                for match in matches]
+
+    assert compile_row_parser(columns, pattern.groups)(matches) == expected
+    assert compile_row_parser((("well", "str"),), 1)(["A1", "A2"]) == [{"well": "A1"}, {"well": "A2"}]
+
+
+class _FakeMessages:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **request):
+        from types import SimpleNamespace
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text="s" * 10000)], usage=None)
+
+
+def test_summary_budgets_must_fit_two_part_summaries():
+    import pytest
+
+    with pytest.raises(ValueError):
+        CompletePDFExtractor(summary_chunk_tokens=1000, summary_map_tokens=500)
+
+
+def test_summary_reduce_always_terminates():
+    from types import SimpleNamespace
+
+    extractor = CompletePDFExtractor(summary_chunk_tokens=1100, summary_map_tokens=500)
+    messages = _FakeMessages()
+    extractor.client = SimpleNamespace(messages=messages)
+    content = "".join(f"\n\n=== PAGE {n} ===\n{'x' * 4000}" for n in range(1, 6))
+    assert extractor.generate_summary(content) == "s" * 10000
+    # 5 page chunks, then reduce levels of 3 and 2 chunks, then the final call
+    assert messages.calls == 11
+
+    # Budgets changed after construction can't keep the reduce loop going
+    extractor.summary_budgets["chunk_tokens"] = 400
+    messages.calls = 0
+    assert extractor.generate_summary(content) == "s" * 10000
+    assert messages.calls < 20
+
+
+def test_page_records_keep_raw_wells_and_merge_into_one_table():
+    import json
+    from complete_pdf_extractor_1 import parse_plate_wells
+
+    wells = ("- **A1**: 0.5 Std - 1,200 (Reduced: 1,150) - Date: 03-Feb-2025 10:11\n"
+             "- **B2**: Blank - Date: No Data\n")
+    full_content = f"\n\n=== PAGE 1 ===\n{wells}\n\n=== PAGE 2 ===\n{wells}"
+    pages = CompletePDFExtractor.split_pages(full_content)
+    json.dumps(pages)
+
+    plate = CompletePDFExtractor.merge_plates(pages)
+    assert list(plate["page"]) == [1, 1, 2, 2]
+    assert list(plate["well"]) == ["A1", "B2", "A1", "B2"]
+    assert plate.drop(columns="page").equals(parse_plate_wells(wells + wells).drop(columns="page"))
+    assert plate.attrs["plate_format"] == 96